@@ -1,13 +1,21 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from strikewise.router import router as strikewise_router
+from strikewise.service import shutdown_analysis_resources
 from dotenv import load_dotenv
 # Import firebase_admin_config to ensure the Firebase Admin SDK is initialized
 import firebase_admin_config #
 
 load_dotenv()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Close the shared HTTP client and CPU pool used by /analyze
+    await shutdown_analysis_resources()
+
+app = FastAPI(lifespan=lifespan)
 
 # Make sure to include your frontend origins here
 origins = [
@@ -12,6 +12,9 @@ class AnalysisRequest(BaseModel):
     risk_tolerance: float
     minutes_to_hit_target: int
     option_type: str
+    # "fast" reuses greeks cached from the last full evaluation for small what-if moves
+    pricing_mode: Literal["full", "fast"] = "full"
+    fast_tolerance: float = Field(0.05, gt=0)  # Max estimated premium error before a strike is fully repriced
 
 class Projection(BaseModel):
     Strike: float
@@ -27,6 +30,7 @@ class Projection(BaseModel):
     Gamma: float
     IV_Used: float
     Lot_Size: int
+    Pricing_Path: Literal["full", "taylor"] = "full"
 
 class SelectedContract(BaseModel):
     Strike: float
@@ -1,7 +1,7 @@
 # strikewise/router.py
 from fastapi import APIRouter, HTTPException, status, Header, Depends
 from strikewise.models import AnalysisRequest, AnalysisResponse, AuthResponse, User # Import User model
-from strikewise.service import run_option_analysis
+from strikewise.service import run_option_analysis_async, AnalysisOverloaded
 from strikewise.auth_service import verify_firebase_id_token, create_backend_jwt # Import the new functions
 
 router = APIRouter()
@@ -53,10 +53,18 @@ async def get_current_user(x_access_token: str = Header(..., alias="Authorizatio
 
 # Existing route for option analysis (now protected)
 @router.post("/analyze", response_model=AnalysisResponse)
-def analyze(request: AnalysisRequest, current_user: User = Depends(get_current_user)):
+async def analyze(request: AnalysisRequest, current_user: User = Depends(get_current_user)):
     # The current_user object will contain the authenticated user's details
     print(f"Analysis requested by user: {current_user.email} (UID: {current_user.id})")
-    return run_option_analysis(request)
+    try:
+        return await run_option_analysis_async(request)
+    except AnalysisOverloaded as e:
+        # Shed load instead of queueing without bound
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Analysis service is busy, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
 
 # --- New Endpoint for Firebase ID Token Verification ---
 
@@ -2,11 +2,18 @@
 
 from strikewise.models import AnalysisRequest, AnalysisResponse
 from strikewise.utils import (
+    async_get_live_option_chain,
+    async_get_nifty_spot_price,
     compute_option_risk_reward_all_strikes,
-    get_nifty_spot_price,
-    get_live_option_chain,
+    estimate_risk_reward_from_snapshot,
     select_best_contracts
 )
+import asyncio
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import httpx
 import pandas as pd
 from datetime import datetime, timedelta
 import os
@@ -25,33 +32,242 @@ if not ACCESS_TOKEN:
 INTEREST_RATE = 0.065
 LOT_SIZE = 75
 
-def run_option_analysis(request: AnalysisRequest) -> AnalysisResponse:
+# Concurrency / admission control for the /analyze CPU stage (network fetches are not slotted)
+CPU_COUNT = os.cpu_count() or 1
+CPU_POOL_KIND = os.getenv("STRIKEWISE_CPU_POOL", "process").lower()  # "process" or "thread"
+CPU_WORKERS = int(os.getenv("STRIKEWISE_CPU_WORKERS", CPU_COUNT))
+MAX_CONCURRENT_ANALYSES = int(os.getenv("STRIKEWISE_MAX_CONCURRENT_ANALYSES", CPU_WORKERS))
+MAX_QUEUED_ANALYSES = int(os.getenv("STRIKEWISE_MAX_QUEUED_ANALYSES", 4 * MAX_CONCURRENT_ANALYSES))
+QUEUE_TIMEOUT_SECONDS = float(os.getenv("STRIKEWISE_QUEUE_TIMEOUT_SECONDS", "2.0"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("STRIKEWISE_HTTP_TIMEOUT_SECONDS", "10.0"))
+RETRY_AFTER_SECONDS = max(1, math.ceil(QUEUE_TIMEOUT_SECONDS))
+
+# Fast (Taylor) what-if path: how long a full evaluation's greeks snapshot stays reusable
+FAST_CACHE_TTL_SECONDS = float(os.getenv("STRIKEWISE_FAST_CACHE_TTL_SECONDS", "60"))
+
+
+class AnalysisOverloaded(Exception):
+    """Raised when an analysis cannot be admitted within the queue-time budget."""
+
+    def __init__(self, retry_after: int = RETRY_AFTER_SECONDS):
+        super().__init__("Analysis capacity exhausted, retry later")
+        self.retry_after = retry_after
+
+
+# Created lazily so they bind to the running event loop / are not spawned at import
+_http_client = None
+_cpu_executor = None
+_analysis_slots = None
+_queued_analyses = 0
+
+# (instrument_key, expiry_date, option_type, minutes_to_hit_target) -> (created_at, current_spot, snapshot_df)
+_snapshot_cache = {}
+
+
+def _prune_snapshot_cache():
+    # Drop expired snapshots so their DataFrames don't live for the whole process
+    now = time.monotonic()
+    expired = [key for key, (created_at, _, _) in _snapshot_cache.items() if now - created_at > FAST_CACHE_TTL_SECONDS]
+    for key in expired:
+        del _snapshot_cache[key]
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(timeout=HTTP_TIMEOUT_SECONDS)
+    return _http_client
+
+
+def _get_cpu_executor():
+    global _cpu_executor
+    if _cpu_executor is None:
+        if CPU_POOL_KIND == "thread":
+            _cpu_executor = ThreadPoolExecutor(max_workers=CPU_WORKERS)
+        else:
+            _cpu_executor = ProcessPoolExecutor(max_workers=CPU_WORKERS)
+    return _cpu_executor
+
+
+def _get_analysis_slots() -> asyncio.Semaphore:
+    global _analysis_slots
+    if _analysis_slots is None:
+        _analysis_slots = asyncio.Semaphore(MAX_CONCURRENT_ANALYSES)
+    return _analysis_slots
+
+
+async def shutdown_analysis_resources():
+    global _http_client, _cpu_executor
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    if _cpu_executor is not None:
+        _cpu_executor.shutdown(wait=False, cancel_futures=True)
+        _cpu_executor = None
+
+
+def _check_capacity():
+    # Fail fast instead of letting the wait queue grow without bound
+    slots = _get_analysis_slots()
+    if slots.locked() and _queued_analyses >= MAX_QUEUED_ANALYSES:
+        raise AnalysisOverloaded()
+
+
+def _release_slot_threadsafe(loop, slots):
+    # Executor futures complete on a worker/manager thread; hop back onto the loop
+    try:
+        loop.call_soon_threadsafe(slots.release)
+    except RuntimeError:
+        pass  # Loop already closed during shutdown
+
+
+async def _run_cpu_stage(func, *args):
+    """
+    Runs `func` on the bounded CPU pool under admission control. Raises AnalysisOverloaded
+    when the queue is full, no slot frees up within QUEUE_TIMEOUT_SECONDS, or the
+    process pool has broken (it is recreated for the next request).
+
+    The slot is released when the pool work finishes, not when this coroutine exits,
+    so cancelled requests cannot push more than MAX_CONCURRENT_ANALYSES jobs into the pool.
+    """
+    global _queued_analyses
+    slots = _get_analysis_slots()
+    _check_capacity()
+
+    _queued_analyses += 1
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        raise AnalysisOverloaded()
+    finally:
+        _queued_analyses -= 1
+
+    loop = asyncio.get_running_loop()
+    executor = _get_cpu_executor()
+    try:
+        future = executor.submit(func, *args)
+    except BrokenProcessPool:
+        slots.release()
+        _discard_broken_executor(executor)
+        raise AnalysisOverloaded()
+    except BaseException:
+        slots.release()
+        raise
+    future.add_done_callback(lambda _: _release_slot_threadsafe(loop, slots))
+
+    try:
+        return await asyncio.wrap_future(future)
+    except BrokenProcessPool:
+        _discard_broken_executor(executor)
+        raise AnalysisOverloaded()
+
+
+def _discard_broken_executor(executor):
+    # A worker died (OOM, segfault); drop the pool so the next request gets a fresh one
+    global _cpu_executor
+    print("❌ CPU process pool broken, recreating it")
+    if _cpu_executor is executor:
+        _cpu_executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run_option_analysis_async(request: AnalysisRequest) -> AnalysisResponse:
+    """
+    /analyze pipeline: network fetches run on the event loop, the pandas/SciPy work
+    runs on the bounded CPU pool via _run_cpu_stage.
+    """
     print("Running option analysis for:", request.instrument_key, request.expiry_date)
     print("Received option_type:", request.option_type)
 
-    # Fetch current spot
-    current_spot = get_nifty_spot_price(ACCESS_TOKEN, request.instrument_key)
+    # The fast path only covers spot moves, so a different horizon needs its own snapshot
+    cache_key = (request.instrument_key, request.expiry_date, request.option_type, request.minutes_to_hit_target)
+
+    if request.pricing_mode == "fast":
+        _prune_snapshot_cache()
+        cached = _snapshot_cache.get(cache_key)
+        if cached is not None:
+            _, cached_spot, snapshot_df = cached
+            print("Using cached greeks snapshot from spot:", cached_spot)
+            return await _run_cpu_stage(analyze_from_snapshot, request, cached_spot, snapshot_df)
+        print("No fresh greeks snapshot, falling back to full evaluation")
+
+    # Shed load before spending upstream calls on a request that would be rejected anyway
+    _check_capacity()
+
+    # Taken before the fetch so the snapshot never outlives the horizon its error bounds cover
+    fetched_at = time.monotonic()
+
+    # Fetch spot and option chain concurrently
+    client = _get_http_client()
+    current_spot, option_chain_df = await asyncio.gather(
+        async_get_nifty_spot_price(client, ACCESS_TOKEN, request.instrument_key),
+        async_get_live_option_chain(client, ACCESS_TOKEN, request.instrument_key, request.expiry_date),
+    )
+    _validate_market_data(current_spot, option_chain_df)
+
+    response, snapshot_df = await _run_cpu_stage(analyze_option_chain, request, current_spot, option_chain_df)
+    if not snapshot_df.empty:
+        _prune_snapshot_cache()
+        _snapshot_cache[cache_key] = (fetched_at, current_spot, snapshot_df)
+    return response
+
+
+def _validate_market_data(current_spot, option_chain_df):
     if current_spot is None:
         raise ValueError("Failed to fetch spot price from Upstox")
 
     print("Current Spot:", current_spot)
 
-    # Fetch live option chain
-    option_chain_df = get_live_option_chain(ACCESS_TOKEN, request.instrument_key, request.expiry_date)
     if option_chain_df is None or option_chain_df.empty:
         raise ValueError("Failed to fetch option chain or option chain is empty")
 
     print("Fetched option chain with", len(option_chain_df), "rows")
 
+
+def _time_to_expiry(request: AnalysisRequest) -> float:
+    # Time to expiry in years, measured from when the target is expected to be hit
+    expiry_datetime = datetime.strptime(f"{request.expiry_date} 15:30:00", "%Y-%m-%d %H:%M:%S")
+    T = (expiry_datetime - (datetime.now() + timedelta(minutes=request.minutes_to_hit_target))).total_seconds() / (365 * 24 * 60 * 60)
+    print("Time to expiry (in years):", round(T, 6))
+    return T
+
+
+def analyze_from_snapshot(request: AnalysisRequest, current_spot: float, snapshot_df: pd.DataFrame) -> AnalysisResponse:
+    """Fast what-if CPU stage: Taylor-expands cached greeks instead of repricing every strike."""
+    spot_target = current_spot + request.spot_target_gain
+    spot_sl = current_spot - request.spot_sl_loss
+    print("Spot Target:", spot_target, "| Spot SL:", spot_sl)
+
+    T = _time_to_expiry(request)
+    option_type = "call" if request.option_type == "CE" else "put"
+
+    projections_df = estimate_risk_reward_from_snapshot(
+        snapshot_df,
+        spot_target,
+        spot_sl,
+        T,
+        INTEREST_RATE,
+        LOT_SIZE,
+        option_type,
+        request.fast_tolerance
+    )
+    if not projections_df.empty:
+        print("Fast projections:", projections_df["Pricing_Path"].value_counts().to_dict())
+
+    return _build_response(projections_df, request)
+
+
+def analyze_option_chain(request: AnalysisRequest, current_spot: float, option_chain_df: pd.DataFrame):
+    """
+    CPU stage of the analysis. Module-level so it can be pickled into the process pool.
+    Returns the response and the greeks snapshot used by the fast what-if path.
+    """
     # Calculate target and stop-loss spot values
     spot_target = current_spot + request.spot_target_gain
     spot_sl = current_spot - request.spot_sl_loss
     print("Spot Target:", spot_target, "| Spot SL:", spot_sl)
 
-    # Time to expiry in years
-    expiry_datetime = datetime.strptime(f"{request.expiry_date} 15:30:00", "%Y-%m-%d %H:%M:%S")
-    T = (expiry_datetime - (datetime.now() + timedelta(minutes=request.minutes_to_hit_target))).total_seconds() / (365 * 24 * 60 * 60)
-    print("Time to expiry (in years):", round(T, 6))
+    T = _time_to_expiry(request)
 
     # Ensure numeric types
     analysis_df = option_chain_df.apply(pd.to_numeric, errors='coerce')
@@ -77,7 +293,7 @@ def run_option_analysis(request: AnalysisRequest) -> AnalysisResponse:
     print("Prepared trade data with", len(trade_df), "rows")
 
     # Compute projections using BSM + estimated IV
-    projections_df = compute_option_risk_reward_all_strikes(
+    projections_df, snapshot_df = compute_option_risk_reward_all_strikes(
         trade_df,
         spot_target,
         spot_sl,
@@ -85,12 +301,17 @@ def run_option_analysis(request: AnalysisRequest) -> AnalysisResponse:
         T,
         INTEREST_RATE,
         LOT_SIZE,
-        option_type
+        option_type,
+        return_snapshot=True,
+        snapshot_horizon=FAST_CACHE_TTL_SECONDS / (365 * 24 * 60 * 60)
     )
 
     print("Projections computed:", len(projections_df), "rows")
-    projections_df.to_csv("projections_output.csv", index=False)
-    
+
+    return _build_response(projections_df, request), snapshot_df
+
+
+def _build_response(projections_df: pd.DataFrame, request: AnalysisRequest) -> AnalysisResponse:
     # Sanitize projections
     projections_df.replace([np.inf, -np.inf], np.nan, inplace=True)
     critical_cols = ["Profit_", "Loss_", "Delta", "Gamma", "IV_Used"]
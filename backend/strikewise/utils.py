@@ -1,71 +1,74 @@
-import requests
 import numpy as np
 import pandas as pd
 from scipy.stats import norm
 
 
-def get_nifty_spot_price(access_token, instrument_key):
+async def async_get_nifty_spot_price(client, access_token, instrument_key):
+    """Fetch the LTP of `instrument_key` using a shared httpx.AsyncClient."""
     url = "https://api.upstox.com/v2/market-quote/ltp"
     headers = {'Authorization': f'Bearer {access_token}'}
     params = {'instrument_key': instrument_key}
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = await client.get(url, headers=headers, params=params)
         response.raise_for_status()
         data = response.json()['data']
         return list(data.values())[0]['last_price']
-    except:
+    except Exception:
         return None
 
 
-def get_live_option_chain(access_token, instrument_key, expiry_date):
+async def async_get_live_option_chain(client, access_token, instrument_key, expiry_date):
+    """Fetch and parse the option chain using a shared httpx.AsyncClient."""
     url = "https://api.upstox.com/v2/option/chain"
     headers = {'Authorization': f'Bearer {access_token}'}
     params = {'instrument_key': instrument_key, 'expiry_date': expiry_date}
-    
+
     try:
-        response = requests.get(url, headers=headers, params=params)
+        response = await client.get(url, headers=headers, params=params)
         response.raise_for_status()
-        raw_data = response.json()
+        return parse_option_chain(response.json())
+
+    except Exception as e:
+        print("❌ Error while fetching option chain:", e)
+        return None
 
-        data = raw_data.get("data", [])
-        if not data:
-            print("❌ No option chain data returned")
-            return None
 
-        df = pd.json_normalize(data, sep='.')
+def parse_option_chain(raw_data):
+    data = raw_data.get("data", [])
+    if not data:
+        print("❌ No option chain data returned")
+        return None
 
-        df.rename(columns={
-            'strike_price': 'Strike',
-            'call_options.market_data.ltp': 'Call LTP',
-            'put_options.market_data.ltp': 'Put LTP',
-            'call_options.option_greeks.iv': 'Call IV',
-            'put_options.option_greeks.iv': 'Put IV',
-            'call_options.market_data.oi': 'Call OI',
-            'put_options.market_data.oi': 'Put OI',
-        }, inplace=True)
+    df = pd.json_normalize(data, sep='.')
 
-        required_columns = [
-            'Strike',
-            'Call LTP', 'Put LTP',
-            'Call IV', 'Put IV',
-            'Call OI', 'Put OI'
-        ]
+    df.rename(columns={
+        'strike_price': 'Strike',
+        'call_options.market_data.ltp': 'Call LTP',
+        'put_options.market_data.ltp': 'Put LTP',
+        'call_options.option_greeks.iv': 'Call IV',
+        'put_options.option_greeks.iv': 'Put IV',
+        'call_options.market_data.oi': 'Call OI',
+        'put_options.market_data.oi': 'Put OI',
+    }, inplace=True)
 
-        for col in required_columns:
-            if col not in df.columns:
-                df[col] = np.nan  # Ensure all required columns exist
+    required_columns = [
+        'Strike',
+        'Call LTP', 'Put LTP',
+        'Call IV', 'Put IV',
+        'Call OI', 'Put OI'
+    ]
 
-        df = df[required_columns].sort_values(by='Strike')
+    for col in required_columns:
+        if col not in df.columns:
+            df[col] = np.nan  # Ensure all required columns exist
 
-        # ✅ Show top 10 rows of the processed option chain
-        print("🔍 Fetched Raw Option Chain Sample:")
-        print(df.head(10).to_string(index=False))
+    df = df[required_columns].sort_values(by='Strike')
 
-        return df
+    # ✅ Show top 10 rows of the processed option chain
+    print("🔍 Fetched Raw Option Chain Sample:")
+    print(df.head(10).to_string(index=False))
 
-    except Exception as e:
-        print("❌ Error while fetching option chain:", e)
-        return None
+    return df
 
 
 def implied_volatility(option_price, S, K, T, r, option_type, tol=1e-5, max_iter=100):
@@ -104,8 +107,56 @@ def bsm_price_and_greeks(S, K, T, r, sigma, option_type):
     return price, delta, gamma
 
 
-def compute_option_risk_reward_all_strikes(df, spot_target, spot_sl, current_spot, T, r, lot_size, option_type):
+def bsm_theta_and_speed(S, K, T, r, sigma, option_type):
+    """Calendar theta (dPrice/dt, per year) and speed (dGamma/dS) for the Taylor fast path."""
+    if T <= 0 or sigma <= 0:
+        return np.nan, np.nan
+    d1 = (np.log(S / K) + (r + 0.5 * sigma ** 2) * T) / (sigma * np.sqrt(T))
+    d2 = d1 - sigma * np.sqrt(T)
+
+    decay = -S * norm.pdf(d1) * sigma / (2 * np.sqrt(T))
+    if option_type == "call":
+        theta = decay - r * K * np.exp(-r * T) * norm.cdf(d2)
+    else:
+        theta = decay + r * K * np.exp(-r * T) * norm.cdf(-d2)
+
+    gamma = norm.pdf(d1) / (S * sigma * np.sqrt(T))
+    speed = -gamma / S * (d1 / (sigma * np.sqrt(T)) + 1)
+    return theta, speed
+
+
+# Fast-path spot band, as a fraction of a one-standard-deviation move (sigma * S * sqrt(T))
+TAYLOR_BAND_SD = 0.25
+TAYLOR_BAND_POINTS = 17
+
+
+def _taylor_error_bounds(S, K, T, r, sigma, option_type, horizon):
+    """
+    Cached error bounds for expanding around (S, T). Returns (max_dS, speed_max, theta_spread):
+    the spot band the expansion is valid for, max |speed| over that band (bounds the
+    third-order remainder), and max |theta - theta(S, T)| over the band and the time
+    window [T - horizon, T] (bounds the linear theta step).
+    """
+    max_dS = TAYLOR_BAND_SD * sigma * S * np.sqrt(T)
+    spots = np.linspace(S - max_dS, S + max_dS, TAYLOR_BAND_POINTS)
+    theta_ref, _ = bsm_theta_and_speed(S, K, T, r, sigma, option_type)
+    thetas_now, speeds = bsm_theta_and_speed(spots, K, T, r, sigma, option_type)
+    thetas_later, _ = bsm_theta_and_speed(spots, K, T - horizon, r, sigma, option_type)
+
+    speed_max = np.max(np.abs(speeds))
+    theta_spread = max(np.max(np.abs(thetas_now - theta_ref)), np.max(np.abs(thetas_later - theta_ref)))
+    return max_dS, speed_max, theta_spread
+
+
+def compute_option_risk_reward_all_strikes(df, spot_target, spot_sl, current_spot, T, r, lot_size, option_type, return_snapshot=False, snapshot_horizon=0.0):
+    """
+    Full BSM repricing of every strike. With return_snapshot=True also returns the
+    per-strike price/delta/gamma/theta at the target and SL spots plus the error bounds
+    estimate_risk_reward_from_snapshot needs for what-if moves up to `snapshot_horizon`
+    years after this evaluation.
+    """
     result = []
+    snapshot = []
 
     for _, row in df.iterrows():
         strike = row["Strike"]
@@ -167,7 +218,7 @@ def compute_option_risk_reward_all_strikes(df, spot_target, spot_sl, current_spo
         target_price, delta, gamma = bsm_price_and_greeks(
             S=spot_target, K=strike, T=T, r=r, sigma=sigma, option_type=option_type
         )
-        sl_price, _, _ = bsm_price_and_greeks(
+        sl_price, sl_delta, sl_gamma = bsm_price_and_greeks(
             S=spot_sl, K=strike, T=T, r=r, sigma=sigma, option_type=option_type
         )
 
@@ -190,36 +241,137 @@ def compute_option_risk_reward_all_strikes(df, spot_target, spot_sl, current_spo
             })
             continue
 
-        capital_per_lot = entry_price * lot_size
-        if option_type == "call":
-            profit_per_lot = (target_price - entry_price) * lot_size
-            loss_per_lot = (entry_price - sl_price) * lot_size
-        else:  # put
-            profit_per_lot = (entry_price - target_price) * lot_size
-            loss_per_lot = (sl_price - entry_price) * lot_size
-        profit_pct = (profit_per_lot / capital_per_lot) * 100 if capital_per_lot > 0 else 0
-        loss_pct = (loss_per_lot / capital_per_lot) * 100 if capital_per_lot > 0 else 0
-
-        result.append({
-            "Strike": round(strike, 2),
-            "LTP": round(entry_price, 2),
-            "Target_Premium": round(target_price, 2),
-            "SL_Premium": round(sl_price, 2),
-            "Capital_Per_Lot": round(capital_per_lot, 2),
-            "Profit_Per_Lot": round(profit_per_lot, 2),
-            "Loss_Per_Lot": round(loss_per_lot, 2),
-            "Profit_": round(profit_pct, 2),
-            "Loss_": round(loss_pct, 2),
-            "Delta": round(delta, 4),
-            "Gamma": round(gamma, 6),
-            "IV_Used": round(iv, 2),
-            "OI": oi,
-            "Lot_Size": lot_size
-        })
+        result.append(_risk_reward_row(
+            strike, entry_price, target_price, sl_price, delta, gamma, iv, oi, lot_size, option_type
+        ))
+
+        if return_snapshot:
+            target_theta, target_speed = bsm_theta_and_speed(spot_target, strike, T, r, sigma, option_type)
+            sl_theta, sl_speed = bsm_theta_and_speed(spot_sl, strike, T, r, sigma, option_type)
+            target_max_dS, target_speed_max, target_theta_spread = _taylor_error_bounds(
+                spot_target, strike, T, r, sigma, option_type, snapshot_horizon
+            )
+            sl_max_dS, sl_speed_max, sl_theta_spread = _taylor_error_bounds(
+                spot_sl, strike, T, r, sigma, option_type, snapshot_horizon
+            )
+            snapshot.append({
+                "Strike": strike,
+                "LTP": entry_price,
+                "IV": iv,
+                "OI": oi,
+                "T": T,
+                "Horizon": snapshot_horizon,
+                "Target_Spot": spot_target,
+                "Target_Price": target_price,
+                "Target_Delta": delta,
+                "Target_Gamma": gamma,
+                "Target_Theta": target_theta,
+                "Target_Speed": target_speed,
+                "Target_Max_dS": target_max_dS,
+                "Target_Speed_Max": target_speed_max,
+                "Target_Theta_Spread": target_theta_spread,
+                "SL_Spot": spot_sl,
+                "SL_Price": sl_price,
+                "SL_Delta": sl_delta,
+                "SL_Gamma": sl_gamma,
+                "SL_Theta": sl_theta,
+                "SL_Speed": sl_speed,
+                "SL_Max_dS": sl_max_dS,
+                "SL_Speed_Max": sl_speed_max,
+                "SL_Theta_Spread": sl_theta_spread,
+            })
+
+    if return_snapshot:
+        return pd.DataFrame(result), pd.DataFrame(snapshot)
+    return pd.DataFrame(result)
+
+
+def _taylor_reprice(row, leg, spot, T):
+    """
+    Second-order Taylor expansion of one leg ("Target" or "SL") around the cached point.
+    Returns (price, delta, gamma, error_bound), using only cached values. The bound is
+    speed_max * |dS|^3 / 6 (Lagrange remainder) plus theta_spread * |dt|; it is infinite
+    outside the cached spot band or time window, which forces a full reprice.
+    """
+    dS = spot - row[f"{leg}_Spot"]
+    dt = row["T"] - T  # time elapsed since the snapshot, in years
+    delta = row[f"{leg}_Delta"]
+    gamma = row[f"{leg}_Gamma"]
+
+    price = row[f"{leg}_Price"] + delta * dS + 0.5 * gamma * dS ** 2 + row[f"{leg}_Theta"] * dt
+    if abs(dS) > row[f"{leg}_Max_dS"] or dt < 0 or dt > row["Horizon"]:
+        error = np.inf
+    else:
+        error = row[f"{leg}_Speed_Max"] * abs(dS) ** 3 / 6 + row[f"{leg}_Theta_Spread"] * dt
+    return price, delta + gamma * dS, gamma + row[f"{leg}_Speed"] * dS, error
+
+
+def estimate_risk_reward_from_snapshot(snapshot_df, spot_target, spot_sl, T, r, lot_size, option_type, tolerance):
+    """
+    Fast what-if path: estimates target/SL premiums from a snapshot produced by
+    compute_option_risk_reward_all_strikes. Strikes whose estimated error exceeds
+    `tolerance` (premium points) are fully repriced; Pricing_Path records which was used.
+    """
+    result = []
+
+    for _, row in snapshot_df.iterrows():
+        strike = row["Strike"]
+        target_price, delta, gamma, target_error = _taylor_reprice(row, "Target", spot_target, T)
+        sl_price, _, _, sl_error = _taylor_reprice(row, "SL", spot_sl, T)
+        pricing_path = "taylor"
+
+        estimate_ok = (
+            target_error <= tolerance and sl_error <= tolerance
+            and target_price >= 0 and sl_price >= 0
+        )  # NaN errors compare False and fall back as well
+        if not estimate_ok:
+            sigma = row["IV"] / 100
+            target_price, delta, gamma = bsm_price_and_greeks(
+                S=spot_target, K=strike, T=T, r=r, sigma=sigma, option_type=option_type
+            )
+            sl_price, _, _ = bsm_price_and_greeks(
+                S=spot_sl, K=strike, T=T, r=r, sigma=sigma, option_type=option_type
+            )
+            pricing_path = "full"
+
+        result.append(_risk_reward_row(
+            strike, row["LTP"], target_price, sl_price, delta, gamma, row["IV"], row["OI"],
+            lot_size, option_type, pricing_path
+        ))
 
     return pd.DataFrame(result)
 
 
+def _risk_reward_row(strike, entry_price, target_price, sl_price, delta, gamma, iv, oi, lot_size, option_type, pricing_path="full"):
+    capital_per_lot = entry_price * lot_size
+    if option_type == "call":
+        profit_per_lot = (target_price - entry_price) * lot_size
+        loss_per_lot = (entry_price - sl_price) * lot_size
+    else:  # put
+        profit_per_lot = (entry_price - target_price) * lot_size
+        loss_per_lot = (sl_price - entry_price) * lot_size
+    profit_pct = (profit_per_lot / capital_per_lot) * 100 if capital_per_lot > 0 else 0
+    loss_pct = (loss_per_lot / capital_per_lot) * 100 if capital_per_lot > 0 else 0
+
+    return {
+        "Strike": round(strike, 2),
+        "LTP": round(entry_price, 2),
+        "Target_Premium": round(target_price, 2),
+        "SL_Premium": round(sl_price, 2),
+        "Capital_Per_Lot": round(capital_per_lot, 2),
+        "Profit_Per_Lot": round(profit_per_lot, 2),
+        "Loss_Per_Lot": round(loss_per_lot, 2),
+        "Profit_": round(profit_pct, 2),
+        "Loss_": round(loss_pct, 2),
+        "Delta": round(delta, 4),
+        "Gamma": round(gamma, 6),
+        "IV_Used": round(iv, 2),
+        "OI": oi,
+        "Lot_Size": lot_size,
+        "Pricing_Path": pricing_path
+    }
+
+
 def select_best_contracts(df, capital, risk_limit):
     selected = []
     capital_remaining = capital
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from strikewise.utils import (
+    bsm_price_and_greeks,
+    compute_option_risk_reward_all_strikes,
+    estimate_risk_reward_from_snapshot,
+)
+
+R = 0.065
+LOT_SIZE = 75
+SPOT = 24000
+TOLERANCE = 0.05
+HORIZON = 60 / (365 * 24 * 60 * 60)
+# Output premiums are rounded to 2 decimals
+ROUNDING = 0.005
+
+
+def _snapshot(option_type, T, spot_target, spot_sl, iv=15.0):
+    chain = pd.DataFrame({
+        "Strike": np.arange(23000, 25001, 100, dtype=float),
+        "LTP": 100.0,
+        "IV": iv,
+        "OI": 0,
+    })
+    _, snapshot_df = compute_option_risk_reward_all_strikes(
+        chain, spot_target, spot_sl, SPOT, T, R, LOT_SIZE, option_type,
+        return_snapshot=True, snapshot_horizon=HORIZON
+    )
+    return snapshot_df
+
+
+def _exact(spot, strike, T, iv, option_type):
+    price, _, _ = bsm_price_and_greeks(spot, strike, T, R, iv / 100, option_type)
+    return price
+
+
+@pytest.mark.parametrize("option_type", ["call", "put"])
+@pytest.mark.parametrize("days", [1, 7])
+@pytest.mark.parametrize("dS", [-150, -100, -50, -10, 10, 50, 100, 150])
+@pytest.mark.parametrize("elapsed", [0, 30 / (365 * 24 * 60 * 60)])
+def test_taylor_rows_within_tolerance(option_type, days, dS, elapsed):
+    T = days / 365
+    spot_target, spot_sl = SPOT + 100, SPOT - 50
+    snapshot_df = _snapshot(option_type, T, spot_target, spot_sl)
+
+    result = estimate_risk_reward_from_snapshot(
+        snapshot_df, spot_target + dS, spot_sl + dS, T - elapsed, R, LOT_SIZE, option_type, TOLERANCE
+    )
+
+    for _, row in result.iterrows():
+        target = _exact(spot_target + dS, row["Strike"], T - elapsed, row["IV_Used"], option_type)
+        sl = _exact(spot_sl + dS, row["Strike"], T - elapsed, row["IV_Used"], option_type)
+        limit = (TOLERANCE if row["Pricing_Path"] == "taylor" else 0) + ROUNDING
+        assert abs(row["Target_Premium"] - target) <= limit, row["Strike"]
+        assert abs(row["SL_Premium"] - sl) <= limit, row["Strike"]
+
+
+def test_atm_speed_near_zero_falls_back():
+    # Speed is ~0 at the expansion point, so |speed| * dS^3 / 6 there (0.041) under-reports
+    # the true second-order error (0.066); the cached band bound must catch it
+    T = 7 / 365
+    snapshot_df = _snapshot("call", T, SPOT + 100, SPOT - 50, iv=12.0)
+    cached = snapshot_df.set_index("Strike").loc[24100]
+    second_order = cached["Target_Price"] + cached["Target_Delta"] * 100 + 0.5 * cached["Target_Gamma"] * 100 ** 2
+    assert abs(second_order - _exact(SPOT + 200, 24100, T, 12.0, "call")) > TOLERANCE
+
+    result = estimate_risk_reward_from_snapshot(
+        snapshot_df, SPOT + 200, SPOT - 50, T, R, LOT_SIZE, "call", TOLERANCE
+    )
+
+    assert result.set_index("Strike").loc[24100, "Pricing_Path"] == "full"
+
+
+def test_large_move_falls_back_to_full():
+    T = 7 / 365
+    snapshot_df = _snapshot("call", T, SPOT + 100, SPOT - 50)
+
+    result = estimate_risk_reward_from_snapshot(
+        snapshot_df, SPOT + 600, SPOT - 50, T, R, LOT_SIZE, "call", TOLERANCE
+    )
+
+    assert (result["Pricing_Path"] == "full").all()
+
+
+def test_elapsed_time_beyond_horizon_falls_back_to_full():
+    T = 1 / 365
+    snapshot_df = _snapshot("call", T, SPOT + 100, SPOT - 50)
+
+    result = estimate_risk_reward_from_snapshot(
+        snapshot_df, SPOT + 100, SPOT - 50, T - 240 / (365 * 24 * 60), R, LOT_SIZE, "call", TOLERANCE
+    )
+
+    assert (result["Pricing_Path"] == "full").all()
+
+
+def test_small_move_uses_taylor():
+    T = 7 / 365
+    snapshot_df = _snapshot("call", T, SPOT + 100, SPOT - 50)
+
+    result = estimate_risk_reward_from_snapshot(
+        snapshot_df, SPOT + 105, SPOT - 45, T, R, LOT_SIZE, "call", TOLERANCE
+    )
+
+    assert (result["Pricing_Path"] == "taylor").all()